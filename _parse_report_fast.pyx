@@ -0,0 +1,57 @@
+# cython: language_level=3
+"""
+Optional compiled version of visualize_report._parse_lines.
+Build it in place with `cythonize -i _parse_report_fast.pyx`. visualize_report
+picks it up when it can be imported and falls back to the pure Python loop otherwise.
+The regex and the record classes are passed in from visualize_report, so the
+two loops must be kept in step.
+"""
+from html import escape as _esc
+
+def parse_lines(lines, line_re, group_cls, member_cls):
+    cdef list groups = []
+    cdef list members = None
+    cdef bytes raw, line
+    cdef str name
+    cdef Py_ssize_t sp
+    current_group = None
+
+    for raw in lines:
+        line = raw.rstrip(b"\r\n")
+
+        if b": " not in line and b" (" not in line:
+            continue
+        m = line_re.match(line)
+        if m is None:
+            continue
+        kind = m.lastgroup
+
+        if kind == "subject":
+            if current_group is not None:
+                groups.append(current_group)
+            current_group = group_cls(m.group("gid").decode(),
+                                      _esc(m.group("subject").decode('utf-8').strip()))
+            members = current_group.members
+            continue
+
+        if current_group is None:
+            continue
+
+        if kind == "score":
+            current_group.score = _esc(m.group("score").decode('utf-8').strip())
+        elif kind == "email":
+            name = m.group("name").decode('utf-8').strip()
+            sp = name.find(' ')
+            initials = name[:1] + (name[sp + 1:].lstrip(' ')[:1] if sp != -1 else '')
+            members.append(member_cls(
+                _esc(name), _esc(m.group("email").decode('utf-8').strip()), _esc(initials)))
+        elif kind == "raw_score":
+            if members:
+                members[-1].raw_score = int(m.group("raw_score"))
+        elif members:
+            members[-1].details = m.group("details").decode('utf-8')
+
+    if current_group is not None:
+        groups.append(current_group)
+
+    return groups
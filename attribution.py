@@ -1,144 +1,192 @@
 import csv
+import glob
+import os
+import re
 import argparse
 import sys
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
 from solver import solve_attribution
 
-def main():
-    parser = argparse.ArgumentParser(description="Student Group Attribution from CSV")
-    parser.add_argument("--input", required=True, help="Input CSV file path")
-    parser.add_argument("--output", required=True, help="Output CSV file path")
-    parser.add_argument("--verbose", action="store_true", help="Enable verbose solver logging")
-    args = parser.parse_args()
+# "1st Choice", "2nd choice", ... -> rank digit, one regex pass per cell
+_RANK_RE = re.compile(r'([1-5])(?:st|nd|rd|th)', re.IGNORECASE)
+# Subject name is the content of the last [...] in the header
+_SUBJECT_HEADER_RE = re.compile(r'.*\[(.+)\]')
 
+def process_one(input_path, output_path, verbose=False, num_workers=None, stall_limit=None):
+    """Parse one survey CSV, solve it and write the results. Returns True on success."""
     students = []
     # Set of all unique subjects encountered
     all_subject_names = set()
 
-    print(f"Reading input from {args.input}...")
+    print(f"Reading input from {input_path}...")
     try:
-        with open(args.input, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            # Normalize headers: strip whitespace
-            reader.fieldnames = [name.strip() for name in reader.fieldnames]
+        df = pd.read_csv(input_path, dtype=str, keep_default_na=False)
+        # Normalize headers: strip whitespace
+        df.columns = df.columns.str.strip()
+
+        # Identify Subject Columns
+        # Format: "Rank your Top 5 Subject Preferences ... [Subject Name]"
+        subject_cols = df.columns[df.columns.str.contains("Rank your Top 5 Subject Preferences", regex=False)]
+        subject_names = subject_cols.str.extract(_SUBJECT_HEADER_RE, expand=False).str.strip()
+        subject_map = {col: name for col, name in zip(subject_cols, subject_names) if isinstance(name, str)}
+        all_subject_names.update(subject_map.values())
+
+        # Parse Subject Ranks in one vectorized pass
+        # Values are "1st Choice", "2nd Choice", etc. -> 1..5, 0 if unranked
+        rank_cols = list(subject_map)
+        ranks = (df[rank_cols]
+                 .apply(lambda c: c.str.extract(_RANK_RE, expand=False))
+                 .fillna(0).astype(int).to_numpy())
+        rank_subjects = [subject_map[col] for col in rank_cols]
+
+        # Only three text columns are read per row: select them once (missing
+        # ones become empty) and unpack plain tuples instead of building a dict per row
+        fields = df.reindex(columns=['Your email', 'Student 1', 'Student 2'], fill_value='')
+
+        for (email, p1, p2), row_ranks in zip(fields.itertuples(index=False, name=None), ranks):
+            email = email.strip()
+            if not email:
+                continue
+
+            s_dict = {
+                'id': email,
+                'name': email.split('@')[0].replace('.', ' ').title(), # Fallback name extraction
+                'email': email,
+                'partner_choices': [],
+                'subject_ranks': [] # list of subject names in order
+            }
             
-            # Identify Subject Columns
-            # Format: "Rank your Top 5 Subject Preferences ... [Subject Name]"
-            subject_map = {} # "Header Name" -> "Subject Name"
-            for header in reader.fieldnames:
-                if "Rank your Top 5 Subject Preferences" in header and "[" in header and "]" in header:
-                    # Extract content between brackets
-                    start = header.rfind("[") + 1
-                    end = header.rfind("]")
-                    if start > 0 and end > start:
-                        subject_name = header[start:end].strip()
-                        subject_map[header] = subject_name
-                        all_subject_names.add(subject_name)
-
-            for row in reader:
-                email = row.get('Your email', '').strip()
-                if not email:
-                    continue
-
-                s_dict = {
-                    'id': email,
-                    'name': email.split('@')[0].replace('.', ' ').title(), # Fallback name extraction
-                    'email': email,
-                    'partner_choices': [],
-                    'subject_ranks': [] # list of subject names in order
-                }
-                
-                # Partners: "Student 1", "Student 2"
-                s_dict['warnings'] = []
-                
-                p1 = row.get('Student 1', '').strip()
-                if p1: 
-                    if p1 == email:
-                        s_dict['warnings'].append(f"Ignored self-choice (Student 1)")
-                    elif p1 not in s_dict['partner_choices']:
-                        s_dict['partner_choices'].append(p1)
-                
-                p2 = row.get('Student 2', '').strip()
-                if p2: 
-                    if p2 == email:
-                        s_dict['warnings'].append(f"Ignored self-choice (Student 2)")
-                    elif p2 not in s_dict['partner_choices']:
-                        s_dict['partner_choices'].append(p2)
-                    
-                # Parse Subject Ranks
-                # Values are "1st Choice", "2nd Choice", etc.
-                # key = rank_int, value = subject_name
-                temp_ranks = {} 
-                
-                for header, subject_name in subject_map.items():
-                    val = row.get(header, '').strip().lower()
-                    if "1st" in val: temp_ranks[0] = subject_name
-                    elif "2nd" in val: temp_ranks[1] = subject_name
-                    elif "3rd" in val: temp_ranks[2] = subject_name
-                    elif "4th" in val: temp_ranks[3] = subject_name
-                    elif "5th" in val: temp_ranks[4] = subject_name
-                
-                # Sort by rank and add to subject_ranks
-                for r in sorted(temp_ranks.keys()):
-                    s_dict['subject_ranks'].append(temp_ranks[r])
-                
-                students.append(s_dict)
+            # Partners: "Student 1", "Student 2"
+            s_dict['warnings'] = []
+            
+            p1 = p1.strip()
+            if p1: 
+                if p1 == email:
+                    s_dict['warnings'].append(f"Ignored self-choice (Student 1)")
+                elif p1 not in s_dict['partner_choices']:
+                    s_dict['partner_choices'].append(p1)
+            
+            p2 = p2.strip()
+            if p2: 
+                if p2 == email:
+                    s_dict['warnings'].append(f"Ignored self-choice (Student 2)")
+                elif p2 not in s_dict['partner_choices']:
+                    s_dict['partner_choices'].append(p2)
                 
+            # key = rank_int, value = subject_name
+            temp_ranks = {} 
+            for col_idx in row_ranks.nonzero()[0]:
+                temp_ranks[int(row_ranks[col_idx]) - 1] = rank_subjects[col_idx]
+            
+            # Sort by rank and add to subject_ranks
+            for r in sorted(temp_ranks.keys()):
+                s_dict['subject_ranks'].append(temp_ranks[r])
+            
+            students.append(s_dict)
+            
     except FileNotFoundError:
-        print(f"Error: Input file {args.input} not found.")
-        sys.exit(1)
+        print(f"Error: Input file {input_path} not found.")
+        return False
     except Exception as e:
         print(f"Error reading CSV: {e}")
-        sys.exit(1)
+        return False
 
     subjects = [{'id': name, 'name': name} for name in all_subject_names]
     
     print(f"Found {len(students)} students and {len(subjects)} unique subjects.")
     print("Running solver...")
     
-    results = solve_attribution(students, subjects, verbose=args.verbose)
+    results = solve_attribution(students, subjects, verbose=verbose, num_workers=num_workers,
+                                stall_limit=stall_limit)
     
     if not results:
         print("No feasible solution found.")
-        sys.exit(1)
+        return False
         
     
     print(f"Success! Formed {len(results)} groups.")
     
     # Generate Detailed Report
-    if args.output.endswith(".csv"):
-        report_filename = args.output.replace(".csv", "_report.txt")
+    if output_path.endswith(".csv"):
+        report_filename = output_path.replace(".csv", "_report.txt")
     else:
-        report_filename = args.output + "_report.txt"
+        report_filename = output_path + "_report.txt"
     print(f"Writing detailed report to {report_filename}...")
-    with open(report_filename, 'w', encoding='utf-8') as f:
-        f.write("Student Attribution Detailed Report\n")
-        f.write("===================================\n\n")
+    lines = [
+        "Student Attribution Detailed Report\n",
+        "===================================\n\n",
+    ]
+    for group in results:
+        sub_name = group['subject']['name'] if group['subject'] else "Unassigned"
+        lines.append(f"Group {group['group_id']}: {sub_name}\n")
+        lines.append(f"Total Group Satisfaction Score: {group['total_score']}\n")
+        lines.append("-" * 40 + "\n")
         
-        for group in results:
-            sub_name = group['subject']['name'] if group['subject'] else "Unassigned"
-            f.write(f"Group {group['group_id']}: {sub_name}\n")
-            f.write(f"Total Group Satisfaction Score: {group['total_score']}\n")
-            f.write("-" * 40 + "\n")
-            
-            for m in group['details']:
-                f.write(f"  - {m['name']} ({m['email']})\n")
-                f.write(f"    Raw Score Contribution: {m['raw_score']}\n")
-                f.write(f"    Details: {m['notes']}\n")
-            f.write("\n")
-
-    print(f"Writing CSV results to {args.output}...")
-    with open(args.output, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["Group ID", "Subject", "Student Name", "Student Email", "Individual Score", "Notes"])
+        for m in group['details']:
+            lines.append(f"  - {m['name']} ({m['email']})\n"
+                         f"    Raw Score Contribution: {m['raw_score']}\n"
+                         f"    Details: {m['notes']}\n")
+        lines.append("\n")
+
+    with open(report_filename, 'w', encoding='utf-8') as f:
+        f.write("".join(lines))
+
+    print(f"Writing CSV results to {output_path}...")
+    rows = [["Group ID", "Subject", "Student Name", "Student Email", "Individual Score", "Notes"]]
+    for group in results:
+        g_id = group['group_id']
+        sub_name = group['subject']['name'] if group['subject'] else "Unassigned"
         
-        for group in results:
-            g_id = group['group_id']
-            sub_name = group['subject']['name'] if group['subject'] else "Unassigned"
-            
-            for m in group['details']:
-                writer.writerow([g_id, sub_name, m['name'], m['email'], m['raw_score'], m['notes']])
+        for m in group['details']:
+            rows.append([g_id, sub_name, m['name'], m['email'], m['raw_score'], m['notes']])
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
                 
     print("Done.")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Student Group Attribution from CSV")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="Input CSV file path")
+    source.add_argument("--glob", help="Process every CSV matching this pattern in parallel (--output is then a directory)")
+    parser.add_argument("--output", required=True, help="Output CSV file path (output directory with --glob)")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose solver logging")
+    parser.add_argument("--stall-limit", type=float, help="Stop the solver after this many seconds without improvement")
+    args = parser.parse_args()
+
+    if args.input:
+        if not process_one(args.input, args.output, args.verbose, stall_limit=args.stall_limit):
+            sys.exit(1)
+        return
+
+    paths = sorted(glob.glob(args.glob))
+    if not paths:
+        print(f"Error: No input file matches {args.glob}.")
+        sys.exit(1)
+    outputs = [os.path.join(args.output, os.path.basename(path)) for path in paths]
+    # Outputs are named after the input file: inputs sharing a file name in
+    # different directories would silently overwrite each other's results
+    source_of = {}
+    for path, output in zip(paths, outputs):
+        if output in source_of:
+            print(f"Error: {source_of[output]} and {path} would both be written to {output}.")
+            sys.exit(1)
+        source_of[output] = path
+    os.makedirs(args.output, exist_ok=True)
+
+    # Each solve is independent. CP-SAT is already multi-threaded, so split
+    # the cores between the files rather than oversubscribing them.
+    cpus = os.cpu_count() or 1
+    max_workers = min(len(paths), cpus)
+    solver_workers = max(1, cpus // max_workers)
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        ok = list(ex.map(process_one, paths, outputs, [args.verbose] * len(paths),
+                         [solver_workers] * len(paths), [args.stall_limit] * len(paths)))
+    if not all(ok):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -1,17 +1,468 @@
+import os
+import threading
+import numpy as np
 from ortools.sat.python import cp_model
 
+# Variable names are only useful when inspecting the model; building them
+# costs one string per variable, so they are only emitted with ATTR_DEBUG set.
+DEBUG = bool(os.environ.get('ATTR_DEBUG'))
+
+# Reward for getting the subject ranked 1st, 2nd, ... 5th. Unranked -> 0.
+REWARD_BY_RANK = np.array([100, 80, 60, 40, 20], dtype=np.int16)
+
 class SolutionPrinter(cp_model.CpSolverSolutionCallback):
-    """Print intermediate solutions."""
-    def __init__(self):
+    """
+    Print intermediate solutions.
+    With a solver and stall_limit, stop the search once no better solution
+    has been found for stall_limit seconds.
+    """
+    def __init__(self, solver=None, stall_limit=None):
         cp_model.CpSolverSolutionCallback.__init__(self)
         self.__solution_count = 0
+        self.__solver = solver
+        self.__stall_limit = stall_limit
+        self.__stall_timer = None
 
     def on_solution_callback(self):
         self.__solution_count += 1
         print(f'Solution {self.__solution_count}, time = {self.WallTime():.2f} s, objective = {self.ObjectiveValue()}')
+        # Every callback is a strict improvement: restart the stall countdown
+        if self.__solver is not None and self.__stall_limit:
+            self.cancel_stall_timer()
+            self.__stall_timer = threading.Timer(self.__stall_limit, self.__solver.StopSearch)
+            self.__stall_timer.daemon = True
+            self.__stall_timer.start()
+
+    def cancel_stall_timer(self):
+        if self.__stall_timer is not None:
+            self.__stall_timer.cancel()
+
+
+def index_students(students, subjects):
+    """
+    Translate string ids to contiguous int ids in a single pass.
+    Returns (partner_idx, rank_idx):
+      partner_idx[s_idx, k] = student index of s's k-th partner choice
+      rank_idx[s_idx, r]    = subject index ranked r-th by s (r < 5)
+    Missing or unknown entries are -1.
+    """
+    id_to_idx = {s['id']: i for i, s in enumerate(students)}
+    sub_id_to_idx = {sub['id']: i for i, sub in enumerate(subjects)}
+
+    max_choices = max([2] + [len(s.get('partner_choices', [])) for s in students])
+    partner_idx = np.full((len(students), max_choices), -1, dtype=np.int32)
+    rank_idx = np.full((len(students), len(REWARD_BY_RANK)), -1, dtype=np.int32)
+    for s_idx, s in enumerate(students):
+        for k, partner_id in enumerate(s.get('partner_choices', [])):
+            partner_idx[s_idx, k] = id_to_idx.get(partner_id, -1)
+        for rank, sub_id in enumerate(s.get('subject_ranks', [])[:len(REWARD_BY_RANK)]):
+            rank_idx[s_idx, rank] = sub_id_to_idx.get(sub_id, -1)
+    return partner_idx, rank_idx
+
+
+def subject_rewards(rank_idx, num_subjects):
+    """
+    Dense reward[s_idx, sub_idx] matrix (int16) from the rank_idx table.
+    """
+    reward = np.zeros((rank_idx.shape[0], num_subjects), dtype=np.int16)
+    s_rows, ranks = np.nonzero(rank_idx >= 0)
+    reward[s_rows, rank_idx[s_rows, ranks]] = REWARD_BY_RANK[ranks]
+    return reward
+
+
+def greedy_assignment(partner_idx, rank_idx, reward, num_groups):
+    """
+    Cheap feasible assignment used to warm-start the solver.
+    Returns (groups, group_subjects): groups is a list of lists of student
+    indices ordered by smallest member, group_subjects the subject index of
+    each group (None if subjects run out).
+
+    A lone student cannot form a group, so no hint is produced for them:
+    >>> rank_idx = np.array([[0, -1, -1, -1, -1]], dtype=np.int32)
+    >>> greedy_assignment(np.full((1, 2), -1, dtype=np.int32), rank_idx,
+    ...                   subject_rewards(rank_idx, 3), 1)
+    ([], [])
+    """
+    num_students, num_subjects = reward.shape
+    top_choice = rank_idx[:, 0].tolist()
+
+    def top_subject(s_idx):
+        return top_choice[s_idx] if top_choice[s_idx] >= 0 else None
+
+    # 1. Mutual partner requests become pairs
+    groups = []
+    assigned = set()
+    for s_idx in range(num_students):
+        for p_idx in partner_idx[s_idx].tolist():
+            if p_idx < 0 or p_idx == s_idx or p_idx in assigned or s_idx in assigned:
+                continue
+            if s_idx in partner_idx[p_idx] and len(groups) < num_groups:
+                groups.append([s_idx, p_idx])
+                assigned.update((s_idx, p_idx))
+
+    singles = [s_idx for s_idx in range(num_students) if s_idx not in assigned]
+
+    # 2. Open the remaining groups with two singletons, sharing a top subject if possible
+    while len(groups) < num_groups and len(singles) >= 2:
+        first = singles.pop(0)
+        match = next((i for i, t in enumerate(singles)
+                      if top_subject(t) is not None and top_subject(t) == top_subject(first)), 0)
+        groups.append([first, singles.pop(match)])
+
+    # 3. Pack leftover singletons into the pairs, preferring a shared top subject
+    #    (a one-student roster opens no pair: it is left unhinted)
+    for s_idx in singles if groups else ():
+        open_groups = [grp for grp in groups if len(grp) < 3] or groups
+        top = top_subject(s_idx)
+        target = next((grp for grp in open_groups
+                       if top is not None and any(top_subject(t) == top for t in grp)), open_groups[0])
+        target.append(s_idx)
+
+    # Canonical labelling, consistent with the symmetry-breaking constraints
+    groups = sorted((sorted(grp) for grp in groups), key=lambda grp: grp[0])
+
+    # 4. Each group takes the free subject with the best combined reward
+    taken = set()
+    group_subjects = []
+    for grp in groups:
+        scores = reward[grp].sum(axis=0)
+        free = [sub_idx for sub_idx in range(num_subjects) if sub_idx not in taken]
+        best = max(free, key=lambda sub_idx: scores[sub_idx]) if free else None
+        if best is not None:
+            taken.add(best)
+        group_subjects.append(best)
+
+    return groups, group_subjects
+
+
+def describe_groups(students, groups):
+    """
+    Build the per-group report entries.
+    groups: list of (group_id, member_idxs, assigned_subject) tuples.
+    """
+    # rank_by_subject[s_idx] = {sub_id: rank}, first occurrence wins like list.index
+    rank_by_subject = []
+    for s in students:
+        ranks = {}
+        for rank, sub_id in enumerate(s.get('subject_ranks', [])):
+            ranks.setdefault(sub_id, rank)
+        rank_by_subject.append(ranks)
+
+    results = []
+    for group_id, member_idxs, assigned_subject in groups:
+        group_members = [students[s_idx] for s_idx in member_idxs]
+
+        # Calculate Score Details for Report
+        member_details = []
+        group_subject_score = 0
+        group_partner_raw_score = 0
+        
+        # Map IDs for easy lookup
+        member_ids = {m['id'] for m in group_members}
+        
+        # 1. Calculate Subject Scores
+        for s_idx, s in zip(member_idxs, group_members):
+            sub_score = 0
+            notes = []
+            # ... Subject Logic ...
+            if assigned_subject:
+                rank = rank_by_subject[s_idx].get(assigned_subject['id'], -1)
+                if rank >= 0:
+                    if rank < len(REWARD_BY_RANK): sub_score = int(REWARD_BY_RANK[rank])
+                    notes.append(f"Subject Rank {rank+1} (+{sub_score})")
+                else:
+                    notes.append("Subject Unranked (+0)")
+            
+            # Partner Raw Calculation (per student contribution)
+            p_contribution = 0
+            for idx, partner_id in enumerate(s.get('partner_choices', [])):
+                if partner_id in member_ids:
+                    p_contribution += 25
+                    notes.append(f"Partner Match: {partner_id} (Raw +25)")
+            
+            if s.get('warnings'):
+                notes.extend(s['warnings'])
+            
+            group_subject_score += sub_score
+            group_partner_raw_score += p_contribution
+            
+            member_details.append({
+                "name": s['name'],
+                "email": s['email'],
+                "raw_score": sub_score + p_contribution, # For CSV roughly
+                "notes": ", ".join(notes)
+            })
+
+        # Apply Partner Cap: REMOVED
+        capped_partner_score = group_partner_raw_score
+        total_group_score = group_subject_score + capped_partner_score
+        
+        # Add a meta-detail for the report regarding the cap
+        cap_note = ""
+
+        results.append({
+            "group_id": group_id,
+            "members": group_members,
+            "subject": assigned_subject,
+            "details": member_details,
+            "total_score": f"{total_group_score} {cap_note}"
+        })
+    return results
+
+
+def trivial_assignment(partner_idx, rank_idx, num_groups):
+    """
+    Closed-form optimum for "clean" inputs, or None.
+
+    Every group has 2 or 3 members and there are num_groups of them, so the
+    group-size bonus is the same for every feasible solution. If the partner
+    choices split the class into exactly num_groups connected components of
+    size 2 or 3, each component agrees on a top subject and those subjects are
+    all distinct, then every student gets both partners and their 1st choice:
+    that reaches the upper bound, so no solve is needed.
+    Returns a list of (member_idxs, sub_idx) ordered by smallest member.
+    """
+    num_students = partner_idx.shape[0]
+
+    # Union-find over partner choices (either direction links two students)
+    parent = list(range(num_students))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    s_rows, cols = np.nonzero(partner_idx >= 0)
+    for s_idx, p_idx in zip(s_rows.tolist(), partner_idx[s_rows, cols].tolist()):
+        a, b = find(s_idx), find(p_idx)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    components = {}
+    for s_idx in range(num_students):
+        components.setdefault(find(s_idx), []).append(s_idx)
+    if len(components) != num_groups:
+        return None
+
+    assignment = []
+    used_subjects = set()
+    for members in components.values():
+        if not 2 <= len(members) <= 3:
+            return None
+        tops = set(rank_idx[members, 0].tolist())
+        if len(tops) != 1:
+            return None
+        top = tops.pop()
+        if top < 0 or top in used_subjects:
+            return None
+        used_subjects.add(top)
+        assignment.append((members, top))
+
+    assignment.sort(key=lambda item: item[0][0])
+    return assignment
+
+
+class ModelSpec:
+    """
+    CP-SAT model for one roster, kept by AttributionModel so that a re-solve after
+    editing preferences only rebuilds the objective.
+
+    The constraints and the x / y / group_of variables depend only on
+    the students, subjects and number of groups. Objective literals are
+    created on first use and cached:
+      same[s_idx, p_idx] -> true iff s and p share a group
+      z[s_idx, sub_idx]  -> per-group literals, z[g] <= x[s, g] and y[g, sub]
+    """
+    def __init__(self, students, subjects, num_groups):
+        self.key = self.roster_key(students, subjects, num_groups)
+        num_students = len(students)
+        self.num_groups = num_groups
+        self.same = {}
+        self.z = {}
 
+        self.model = model = cp_model.CpModel()
 
-def solve_attribution(students, subjects, target_group_size=3, verbose=False):
+        # Variables
+        # x[s_idx, g] = 1 if student s is in group g
+        self.x = x = np.empty((num_students, num_groups), dtype=object)
+        for s_idx, s in enumerate(students):
+            for g in range(num_groups):
+                x[s_idx, g] = model.NewBoolVar(f'x_s{s["id"]}_g{g}' if DEBUG else '')
+                
+        # y[g, sub_idx] = 1 if group g is assigned subject sub
+        self.y = y = np.empty((num_groups, len(subjects)), dtype=object)
+        for g in range(num_groups):
+            for sub_idx, sub in enumerate(subjects):
+                y[g, sub_idx] = model.NewBoolVar(f'y_g{g}_sub{sub["id"]}' if DEBUG else '')
+
+        # Constraints
+    
+        # 1. Each student in exactly one group
+        for s_idx in range(num_students):
+            model.Add(cp_model.LinearExpr.Sum(list(x[s_idx, :])) == 1)
+
+        # 2. Group size constraints
+        # Min 2, max 3. Target 3.
+        # User Requirement: Never 4. 2 groups of 2 is better than 1 of 4.
+        for g in range(num_groups):
+            size = cp_model.LinearExpr.Sum(list(x[:, g]))
+            model.Add(size >= 2)
+            model.Add(size <= 3)
+        
+            # Each group must have exactly one subject
+            model.Add(cp_model.LinearExpr.Sum(list(y[g, :])) == 1)
+
+        # 3. Subject Uniqueness: A subject must not be assigned twice
+        for sub_idx in range(len(subjects)):
+            model.Add(cp_model.LinearExpr.Sum(list(y[:, sub_idx])) <= 1)
+
+        # 4. Symmetry Breaking: groups are interchangeable, so only keep the
+        # labelling where groups are ordered by their smallest member index.
+        # min_member[g] = min over s of (s if x[s, g] else num_students)
+        self.min_member = min_member = []
+        for g in range(num_groups):
+            m_var = model.NewIntVar(0, num_students, f'min_member_g{g}' if DEBUG else '')
+            model.AddMinEquality(m_var, [num_students - (num_students - s_idx) * x[s_idx, g]
+                                         for s_idx in range(num_students)])
+            min_member.append(m_var)
+        for g in range(num_groups - 1):
+            model.Add(min_member[g] < min_member[g + 1])
+        # Group g's smallest member has index >= g, so student s never sits in a group above s.
+        for s_idx in range(min(num_students, num_groups)):
+            for g in range(s_idx + 1, num_groups):
+                model.Add(x[s_idx, g] == 0)
+
+        # group_of[s_idx] = index of the group student s is in (channeled to x)
+        self.group_of = []
+        for s_idx, s in enumerate(students):
+            g_var = model.NewIntVar(0, num_groups - 1, f'g_s{s["id"]}' if DEBUG else '')
+            model.Add(g_var == cp_model.LinearExpr.WeightedSum(list(x[s_idx, :]), list(range(num_groups))))
+            self.group_of.append(g_var)
+
+    @staticmethod
+    def roster_key(students, subjects, num_groups):
+        """Everything the constraints depend on; preferences are not part of it."""
+        return (tuple(s['id'] for s in students), tuple(sub['id'] for sub in subjects), num_groups)
+
+    def same_group(self, s_idx, p_idx):
+        """Literal true iff students s and p are in the same group."""
+        same = self.same.get((s_idx, p_idx))
+        if same is None:
+            model, group_of = self.model, self.group_of
+            same = model.NewBoolVar(f'same_{s_idx}_{p_idx}' if DEBUG else '')
+            model.Add(group_of[s_idx] == group_of[p_idx]).OnlyEnforceIf(same)
+            model.Add(group_of[s_idx] != group_of[p_idx]).OnlyEnforceIf(same.Not())
+            self.same[s_idx, p_idx] = same
+        return same
+
+    def subject_literals(self, s_idx, sub_idx):
+        """Per-group literals rewarding student s for getting subject sub."""
+        zs = self.z.get((s_idx, sub_idx))
+        if zs is None:
+            model = self.model
+            zs = []
+            for g in range(self.num_groups):
+                # z <= x AND z <= y is enough: reward > 0 and we maximize,
+                # so the solver raises z whenever both hold.
+                z = model.NewBoolVar(f'z_{s_idx}_{g}_{sub_idx}' if DEBUG else '')
+                model.AddImplication(z, self.x[s_idx, g])
+                model.AddImplication(z, self.y[g, sub_idx])
+                zs.append(z)
+            self.z[s_idx, sub_idx] = zs
+        return zs
+
+    def set_objective(self, partner_idx, reward):
+        """(Re)build the objective from the current preferences."""
+        num_students = partner_idx.shape[0]
+        # All objective terms will be added here, as parallel literal / weight lists
+        obj_vars = []
+        obj_weights = []
+
+        # 1. Partner Preferences
+        # partner_weight[s, p] = weight of s choosing p, built in one pass
+        weight = 25 # Compromise: High enough to keep mutuals together (25+25 > 20+20 drop)
+        partner_weight = np.zeros((num_students, num_students), dtype=np.int32)
+        s_rows, choices = np.nonzero(partner_idx >= 0)
+        np.add.at(partner_weight, (s_rows, partner_idx[s_rows, choices]), weight)
+        np.fill_diagonal(partner_weight, 0)
+
+        # Fold both directions onto the upper triangle so that a mutual choice
+        # shares a single same_group literal (25 per direction).
+        pair_weight = np.triu(partner_weight + partner_weight.T, k=1)
+        rows, cols = np.nonzero(pair_weight)
+        for s_idx, p_idx in zip(rows.tolist(), cols.tolist()):
+            obj_vars.append(self.same_group(s_idx, p_idx))
+        obj_weights.extend(pair_weight[rows, cols].tolist())
+
+        # 2. Subject Preferences
+        nz_s, nz_sub = np.nonzero(reward)
+        for s_idx, sub_idx in zip(nz_s.tolist(), nz_sub.tolist()):
+            obj_vars.extend(self.subject_literals(s_idx, sub_idx))
+            obj_weights.extend([int(reward[s_idx, sub_idx])] * self.num_groups)
+
+        # 3. Target Group Size 3
+        # Sizes are 2 or 3 and add up to num_students, so the number of groups
+        # of 3 is num_students - 2 * num_groups in every feasible solution: the
+        # bonus is a constant offset. It is kept (rather than dropped) so the
+        # objective value, and the relative gap limit, stay on the same scale.
+        size_bonus = 50 * (num_students - 2 * self.num_groups)
+
+        self.model.Maximize(cp_model.LinearExpr.WeightedSum(obj_vars, obj_weights) + size_bonus)
+
+    def set_hint(self, hint_groups, hint_subjects):
+        """
+        Replace the solution hint with the given group / subject assignment.
+        Every variable derived from x and y is hinted too (group index, smallest
+        member, same_group and z literals): CP-SAT only reliably starts from a
+        hint that covers the whole model.
+        """
+        model, x, y = self.model, self.x, self.y
+        num_students = x.shape[0]
+        model.ClearHints()
+
+        hinted_group = {}
+        for g, (members, sub_hint) in enumerate(zip(hint_groups, hint_subjects)):
+            for s_idx in range(num_students):
+                model.AddHint(x[s_idx, g], s_idx in members)
+            for sub_idx in range(y.shape[1]):
+                model.AddHint(y[g, sub_idx], sub_idx == sub_hint)
+            model.AddHint(self.min_member[g], min(members))
+            for s_idx in members:
+                hinted_group[s_idx] = g
+
+        # Students the hint leaves out (no group to join) keep their
+        # auxiliaries unhinted as well
+        for s_idx, g in hinted_group.items():
+            model.AddHint(self.group_of[s_idx], g)
+        for (s_idx, p_idx), same in self.same.items():
+            if s_idx in hinted_group and p_idx in hinted_group:
+                model.AddHint(same, hinted_group[s_idx] == hinted_group[p_idx])
+        for (s_idx, sub_idx), zs in self.z.items():
+            if s_idx in hinted_group:
+                for g, z in enumerate(zs):
+                    model.AddHint(z, g == hinted_group[s_idx] and hint_subjects[g] == sub_idx)
+
+
+class AttributionModel:
+    """
+    Holds the CP-SAT model between solve_attribution calls, so re-solving the
+    same roster with edited preferences only rebuilds the objective.
+    Pass the same instance to each call; it is not safe to share across threads.
+    """
+    def __init__(self):
+        self.spec = None
+
+    def spec_for(self, students, subjects, num_groups):
+        """The kept ModelSpec if the roster is unchanged, else a fresh one."""
+        key = ModelSpec.roster_key(students, subjects, num_groups)
+        if self.spec is None or self.spec.key != key:
+            self.spec = ModelSpec(students, subjects, num_groups)
+        return self.spec
+
+
+def solve_attribution(students, subjects, target_group_size=3, verbose=False, num_workers=None,
+                      stall_limit=None, model=None):
     """
     students: list of dicts {
         'id': str/int, 
@@ -19,6 +470,9 @@ def solve_attribution(students, subjects, target_group_size=3, verbose=False):
         'subject_ranks': [sub_id1, sub_id2, sub_id3] 
     }
     subjects: list of dicts {'id': str/int, 'name': str}
+    num_workers: CP-SAT search workers, defaults to one per core
+    stall_limit: stop once no better solution was found for this many seconds
+    model: AttributionModel to reuse across calls; a fresh model is built otherwise
     """
     
     if not students or not subjects:
@@ -28,201 +482,58 @@ def solve_attribution(students, subjects, target_group_size=3, verbose=False):
     # Heuristic: Target group size 3
     num_groups = (num_students + target_group_size - 1) // target_group_size 
 
-    model = cp_model.CpModel()
+    # Contiguous int ids for partners and ranked subjects
+    partner_idx, rank_idx = index_students(students, subjects)
 
-    # Variables
-    # x[s_idx, g] = 1 if student s is in group g
-    x = {}
-    for s_idx, s in enumerate(students):
-        for g in range(num_groups):
-            x[s_idx, g] = model.NewBoolVar(f'x_s{s["id"]}_g{g}')
-            
-    # y[g, sub_idx] = 1 if group g is assigned subject sub
-    y = {}
-    for g in range(num_groups):
-        for sub_idx, sub in enumerate(subjects):
-            y[g, sub_idx] = model.NewBoolVar(f'y_g{g}_sub{sub["id"]}')
+    # Fast path: the optimum is obvious, skip model construction entirely
+    trivial = trivial_assignment(partner_idx, rank_idx, num_groups)
+    if trivial is not None:
+        print("Trivial instance, skipping solver.")
+        return describe_groups(students, [(g + 1, members, subjects[sub_idx])
+                                          for g, (members, sub_idx) in enumerate(trivial)])
 
-    # Constraints
-    
-    # 1. Each student in exactly one group
-    for s_idx in range(num_students):
-        model.Add(sum(x[s_idx, g] for g in range(num_groups)) == 1)
-
-    # 2. Group size constraints
-    # Min 2, max 3. Target 3.
-    # User Requirement: Never 4. 2 groups of 2 is better than 1 of 4.
-    for g in range(num_groups):
-        size = sum(x[s_idx, g] for s_idx in range(num_students))
-        model.Add(size >= 2)
-        model.Add(size <= 3)
-        
-        # Each group must have exactly one subject
-        model.Add(sum(y[g, sub_idx] for sub_idx in range(len(subjects))) == 1)
-
-    # 3. Subject Uniqueness: A subject must not be assigned twice
-    for sub_idx in range(len(subjects)):
-        model.Add(sum(y[g, sub_idx] for g in range(num_groups)) <= 1)
+    # Reuse the caller's model when only preferences changed
+    if model is not None:
+        spec = model.spec_for(students, subjects, num_groups)
+    else:
+        spec = ModelSpec(students, subjects, num_groups)
+    x, y = spec.x, spec.y
 
-    # Objective Function
-    obj_terms = [] # All objective terms will be added here
+    reward = subject_rewards(rank_idx, len(subjects))
+    spec.set_objective(partner_idx, reward)
 
-    # Map student ID to index for easier lookup
-    id_to_idx = {s['id']: i for i, s in enumerate(students)}
-    
-    # 1. Partner Preferences
-    # Per-group partner score accumulation
-    group_partner_scores = [[] for _ in range(num_groups)]
-
-    for s_idx in range(num_students):
-        s = students[s_idx]
-        
-        for choice_priority, partner_id in enumerate(s.get('partner_choices', [])):
-            if partner_id in id_to_idx:
-                p_idx = id_to_idx[partner_id]
-                weight = 25 # Compromise: High enough to keep mutuals together (25+25 > 20+20 drop)
-                
-                for g in range(num_groups):
-                    b_together = model.NewBoolVar(f'together_{s_idx}_{p_idx}_{g}')
-                    # b_together is true ONLY if both s and p are in group g
-                    model.AddBoolAnd([x[s_idx, g], x[p_idx, g]]).OnlyEnforceIf(b_together)
-                    model.AddBoolOr([x[s_idx, g].Not(), x[p_idx, g].Not()]).OnlyEnforceIf(b_together.Not())
-                    
-                    # Add to group list
-                    group_partner_scores[g].append(b_together * weight)
-
-    # Apply CAP per group
-    # Cap = 80. 
-    # Logic: capped_score <= raw_sum AND capped_score <= 80. 
-    # Since we Maximize, it will push to min(raw, 80).
-    for g in range(num_groups):
-        if group_partner_scores[g]:
-            raw_sum = sum(group_partner_scores[g])
-            # Removed CAP: capped_var logic removed
-            obj_terms.append(raw_sum)
-
-    # 2. Subject Preferences
-    # Map subject ID to index
-    sub_id_to_idx = {sub['id']: i for i, sub in enumerate(subjects)}
-    
-    for s_idx, s in enumerate(students):
-        # s['subject_ranks'] is a list of subject IDs in order of preference
-        ranks = {sub_id: rank for rank, sub_id in enumerate(s.get('subject_ranks', []))}
-        
-        for g in range(num_groups):
-            for sub_idx, sub in enumerate(subjects):
-                # Calculate cost/reward
-                # Rank 0 (1st choice) -> Reward 20
-                # Rank 1 (2nd choice) -> Reward 15
-                # Rank 2 (3rd choice) -> Reward 10
-                # Unranked -> Reward 0
-                
-                rank = ranks.get(sub['id'])
-                reward = 0
-                if rank == 0: reward = 100
-                elif rank == 1: reward = 80
-                elif rank == 2: reward = 60
-                elif rank == 3: reward = 40   # 4th Choice
-                elif rank == 4: reward = 20   # 5th Choice
-                
-                if reward > 0:
-                    z = model.NewBoolVar(f'z_{s_idx}_{g}_{sub_idx}')
-                    model.AddBoolAnd([x[s_idx, g], y[g, sub_idx]]).OnlyEnforceIf(z)
-                    model.AddBoolOr([x[s_idx, g].Not(), y[g, sub_idx].Not()]).OnlyEnforceIf(z.Not())
-                    obj_terms.append(reward * z)
-
-    # 3. Target Group Size 3
-    for g in range(num_groups):
-        is_3 = model.NewBoolVar(f'g{g}_is_3')
-        model.Add(sum(x[s_idx, g] for s_idx in range(num_students)) == 3).OnlyEnforceIf(is_3)
-        obj_terms.append(50 * is_3)
+    # Warm start from a greedy assignment
+    spec.set_hint(*greedy_assignment(partner_idx, rank_idx, reward, num_groups))
 
     # Solve
-    model.Maximize(sum(obj_terms))
     solver = cp_model.CpSolver()
     solver.parameters.log_search_progress = verbose
+    # Portfolio search: one worker per core, each running a different strategy
+    solver.parameters.num_workers = num_workers or os.cpu_count() or 8
+    # Full linear relaxation: the model is a weighted 0-1 program, LP bounds prune a lot
+    solver.parameters.linearization_level = 2
+    # Near-optimal is good enough: a 1% gap is not noticeable in the groups,
+    # and proving the last percent is usually most of the run time.
+    solver.parameters.relative_gap_limit = 0.01
+    solver.parameters.max_time_in_seconds = 60
     
     print("Starting solver...")
-    solution_printer = SolutionPrinter()
-    status = solver.Solve(model, solution_printer)
+    solution_printer = SolutionPrinter(solver, stall_limit)
+    status = solver.Solve(spec.model, solution_printer)
+    solution_printer.cancel_stall_timer()
 
-    results = []
     if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        groups = []
         for g in range(num_groups):
-            group_members = []
-            for s_idx in range(num_students):
-                if solver.Value(x[s_idx, g]):
-                    group_members.append(students[s_idx])
-            
-            if not group_members: continue
+            member_idxs = [s_idx for s_idx in range(num_students) if solver.Value(x[s_idx, g])]
+            if not member_idxs: continue
             
             assigned_subject = None
             for sub_idx, sub in enumerate(subjects):
                 if solver.Value(y[g, sub_idx]):
                     assigned_subject = sub
                     break
-            
-            # Calculate Score Details for Report
-            member_details = []
-            group_subject_score = 0
-            group_partner_raw_score = 0
-            
-            # Map IDs for easy lookup
-            member_ids = {m['id'] for m in group_members}
-            
-            # 1. Calculate Subject Scores
-            for s in group_members:
-                sub_score = 0
-                notes = []
-                # ... Subject Logic ...
-                rank = -1
-                if assigned_subject:
-                    try:
-                        rank = s['subject_ranks'].index(assigned_subject['id'])
-                        if rank == 0: sub_score = 100
-                        elif rank == 1: sub_score = 80
-                        elif rank == 2: sub_score = 60
-                        elif rank == 3: sub_score = 40
-                        elif rank == 4: sub_score = 20
-                        
-                        notes.append(f"Subject Rank {rank+1} (+{sub_score})")
-                    except ValueError:
-                        notes.append("Subject Unranked (+0)")
-                
-                # Partner Raw Calculation (per student contribution)
-                p_contribution = 0
-                for idx, partner_id in enumerate(s.get('partner_choices', [])):
-                    if partner_id in member_ids:
-                        p_contribution += 25
-                        notes.append(f"Partner Match: {partner_id} (Raw +25)")
-                
-                if s.get('warnings'):
-                    notes.extend(s['warnings'])
-                
-                group_subject_score += sub_score
-                group_partner_raw_score += p_contribution
-                
-                member_details.append({
-                    "name": s['name'],
-                    "email": s['email'],
-                    "raw_score": sub_score + p_contribution, # For CSV roughly
-                    "notes": ", ".join(notes)
-                })
-
-            # Apply Partner Cap: REMOVED
-            capped_partner_score = group_partner_raw_score
-            total_group_score = group_subject_score + capped_partner_score
-            
-            # Add a meta-detail for the report regarding the cap
-            cap_note = ""
-
-            results.append({
-                "group_id": g + 1,
-                "members": group_members,
-                "subject": assigned_subject,
-                "details": member_details,
-                "total_score": f"{total_group_score} {cap_note}"
-            })
-        return results
+            groups.append((g + 1, member_idxs, assigned_subject))
+        return describe_groups(students, groups)
     else:
         return None
@@ -0,0 +1,73 @@
+import random
+import re
+
+import pytest
+from ortools.sat.python import cp_model
+
+import solver
+
+
+def _roster(num_students, num_subjects, seed):
+    """Random roster: 2-5 ranked subjects and two partner choices per student."""
+    rng = random.Random(seed)
+    subjects = [{'id': f'sub{i}', 'name': f'Subject {i}'} for i in range(num_subjects)]
+    ids = [f's{i}' for i in range(num_students)]
+    students = []
+    for s_id in ids:
+        ranked = rng.sample(range(num_subjects), rng.randint(2, 5))
+        students.append({
+            'id': s_id, 'name': s_id, 'email': f'{s_id}@example.com',
+            'partner_choices': rng.sample([p for p in ids if p != s_id], 2),
+            'subject_ranks': [subjects[sub_idx]['id'] for sub_idx in ranked],
+        })
+    return students, subjects
+
+
+def _greedy_score(students, subjects, num_groups):
+    """Objective of the greedy warm start, by solving with x / y fixed to it."""
+    partner_idx, rank_idx = solver.index_students(students, subjects)
+    reward = solver.subject_rewards(rank_idx, len(subjects))
+    groups, group_subjects = solver.greedy_assignment(partner_idx, rank_idx, reward, num_groups)
+
+    spec = solver.ModelSpec(students, subjects, num_groups)
+    spec.set_objective(partner_idx, reward)
+    for g, (members, sub_hint) in enumerate(zip(groups, group_subjects)):
+        for s_idx in range(len(students)):
+            spec.model.Add(spec.x[s_idx, g] == int(s_idx in members))
+        for sub_idx in range(len(subjects)):
+            spec.model.Add(spec.y[g, sub_idx] == int(sub_idx == sub_hint))
+    cp_solver = cp_model.CpSolver()
+    assert cp_solver.Solve(spec.model) == cp_model.OPTIMAL
+    return cp_solver.ObjectiveValue()
+
+
+@pytest.mark.parametrize("num_workers", [1, 8])
+def test_first_solution_not_worse_than_greedy_hint(capsys, num_workers):
+    students, subjects = _roster(45, 20, seed=0)
+    greedy = _greedy_score(students, subjects, num_groups=15)
+
+    assert solver.solve_attribution(students, subjects, num_workers=num_workers,
+                                    stall_limit=1) is not None
+    first = re.search(r"Solution 1, .* objective = ([\d.]+)", capsys.readouterr().out)
+    assert first is not None
+    assert float(first.group(1)) >= greedy
+
+
+def _objective(results, num_students, num_groups):
+    """Solver objective of solve_attribution's report: group scores plus the size bonus."""
+    return (sum(int(r['total_score'].split()[0]) for r in results)
+            + 50 * (num_students - 2 * num_groups))
+
+
+def test_reused_model_matches_fresh_build():
+    first, subjects = _roster(12, 8, seed=1)
+    second, _ = _roster(12, 8, seed=2) # same ids and subjects, new preferences
+
+    model = solver.AttributionModel()
+    assert solver.solve_attribution(first, subjects, num_workers=1, model=model) is not None
+    kept = model.spec
+    reused = solver.solve_attribution(second, subjects, num_workers=1, model=model)
+    assert model.spec is kept
+
+    fresh = solver.solve_attribution(second, subjects, num_workers=1)
+    assert _objective(reused, 12, 4) == _objective(fresh, 12, 4)
@@ -2,175 +2,268 @@ import re
 import argparse
 import sys
 import os
+import mmap
+import stat
+import hashlib
+import shutil
+import tempfile
+import io
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from html import escape as _esc
+
+# Optional compiled parse loop (see _parse_report_fast.pyx); pure Python otherwise
+try:
+    from _parse_report_fast import parse_lines as _parse_lines_fast
+except ImportError:
+    _parse_lines_fast = None
+
+# Report line patterns, fused into one alternation so each line is matched once.
+# The name of the last group that matched (m.lastgroup) tells which kind of line it is.
+# Bytes patterns: lines are matched straight from the mapped file and only
+# the captured fields are decoded.
+_LINE_RE = re.compile(
+    rb"Group (?P<gid>\d+): (?P<subject>.+)"
+    rb"|\s*Total Group Satisfaction Score: (?P<score>.+)"
+    rb"|\s+-\s+(?P<name>.+) \((?P<email>.+)\)"
+    rb"|\s+Raw Score Contribution: (?P<raw_score>\d+)"
+    rb"|\s+Details: (?P<details>.+)"
+)
+
+# Details string tokens, scanned in a single pass
+# "Subject Rank 1 (+100), Partner Match: jihad.ouard@imt-atlantique.net (Raw +25)"
+# m.lastgroup is "score", "unranked", "partner" or "self_choice"
+_DETAIL_TOKEN_RE = re.compile(
+    r"Subject (?:Rank (?P<rank>\d+) \(\+(?P<score>\d+)\)|(?P<unranked>Unranked))"
+    r"|(?P<partner>Partner Match: [^ ]+ \(Raw \+\d+\))"
+    r"|(?P<self_choice>Ignored self-choice)"
+)
+
+# Subject score -> badge colour class, anything else is gray
+_SCORE_BADGE = {
+    100: "badge-green",
+    80: "badge-lime",
+    60: "badge-yellow",
+    40: "badge-orange",
+    20: "badge-red",
+}
+
+# Badge markup shared by every member that earns it
+_BADGE_PARTNER = '<span class="badge badge-blue">Partner Match (+25)</span>'
+_BADGE_UNRANKED = '<span class="badge badge-gray">Unranked (+0)</span>'
+_BADGE_SELF = '<span class="badge badge-gray">Self-choice Ignored</span>'
+_BADGE_RANK_TMPL = '<span class="badge %s">Subject Rank %d (+%d)</span>'
+
+class _Member:
+    """One student line of a group, with its stats."""
+    __slots__ = ("name", "email", "initials", "raw_score", "details")
+
+    def __init__(self, name, email, initials):
+        self.name = name
+        self.email = email
+        self.initials = initials
+        self.raw_score = 0
+        self.details = ""
+
+class _Group:
+    """One group block of the report."""
+    __slots__ = ("id", "subject", "score", "members")
+
+    def __init__(self, id, subject):
+        self.id = id
+        self.subject = subject
+        self.score = 0
+        self.members = []
 
 def parse_report(filepath):
-    """Parses the text report into a structured list of groups."""
+    """
+    Parses the text report into a structured list of groups.
+    Text fields (subject, score, name, email, initials) are HTML-escaped here,
+    once, so generate_html can interpolate them as-is.
+    """
+    with _open_report(filepath) as (_, lines):
+        return _parse_any(lines)
+
+@contextmanager
+def _open_report(filepath):
+    """
+    Yields (buffer, lines) for a report: its bytes, usable for hashing, and an
+    iterator over its lines as bytes, split on b"\n" only.
+    A regular file is mapped and walked in place: the kernel pages it in on
+    demand, and skipped lines are never decoded. Pipes and other special files
+    cannot be mapped (and report a size of 0), so they are read into memory.
+    """
+    with open(filepath, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if stat.S_ISREG(st.st_mode) and st.st_size > 0: # mmap refuses empty files
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield mm, iter(mm.readline, b"")
+        else:
+            data = f.read()
+            yield data, iter(io.BytesIO(data).readline, b"")
+
+def _parse_any(lines):
+    """Runs the compiled parse loop when available, the Python one otherwise."""
+    if _parse_lines_fast is not None:
+        return _parse_lines_fast(lines, _LINE_RE, _Group, _Member)
+    return _parse_lines(lines)
+
+def _parse_lines(lines):
+    """Builds the groups from an iterable of raw (bytes) report lines."""
     groups = []
     current_group = None
-    
-    # Regex patterns
-    group_header_re = re.compile(r"Group (\d+): (.+)")
-    score_re = re.compile(r"Total Group Satisfaction Score: (.+)")
-    member_re = re.compile(r"\s+-\s+(.+) \((.+)\)")
-    raw_score_re = re.compile(r"\s+Raw Score Contribution: (\d+)")
-    details_re = re.compile(r"\s+Details: (.+)")
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-        
-    for line in lines:
-        line = line.strip('\n') # Keep leading spaces for indent detection
-        
+    members = None # current_group.members, kept in a local for the stats lines
+
+    for raw in lines:
+        line = raw.rstrip(b"\r\n") # Keep leading spaces for indent detection
+
+        # Every line _LINE_RE can match contains ": " or " (": skip blank,
+        # separator and title lines with a substring test, before the regex engine
+        if b": " not in line and b" (" not in line:
+            continue
+        m = _LINE_RE.match(line)
+        if not m:
+            continue
+        kind = m.lastgroup
+
         # Group Header
-        m = group_header_re.match(line)
-        if m:
+        if kind == "subject":
             if current_group:
                 groups.append(current_group)
-            current_group = {
-                "id": m.group(1),
-                "subject": m.group(2).strip(),
-                "score": 0,
-                "members": []
-            }
+            current_group = _Group(m.group("gid").decode(),
+                                   _esc(m.group("subject").decode('utf-8').strip()))
+            members = current_group.members
             continue
-            
-        # Total Score
-        m = score_re.match(line.strip())
-        if m and current_group:
-            current_group["score"] = m.group(1).strip()
+
+        if not current_group:
             continue
-            
+        
+        # Total Score
+        if kind == "score":
+            current_group.score = _esc(m.group("score").decode('utf-8').strip())
+        
         # Member Name
-        # Check for member line (indented)
-        if line.strip().startswith("-") and current_group:
-            m = member_re.match(line)
-            if m:
-                current_group["members"].append({
-                    "name": m.group(1).strip(),
-                    "email": m.group(2).strip(),
-                    "raw_score": 0,
-                    "details": ""
-                })
-            continue
+        elif kind == "email":
+            name = m.group("name").decode('utf-8').strip()
+            # First letter of the first two words
+            sp = name.find(' ')
+            initials = name[:1] + (name[sp + 1:].lstrip(' ')[:1] if sp != -1 else '')
+            members.append(_Member(
+                _esc(name), _esc(m.group("email").decode('utf-8').strip()), _esc(initials)))
 
         # Member Stats
-        if current_group and current_group["members"]:
-            last_member = current_group["members"][-1]
-            
-            m = raw_score_re.match(line)
-            if m:
-                last_member["raw_score"] = m.group(1)
-                continue
-                
-            m = details_re.match(line)
-            if m:
-                last_member["details"] = m.group(1)
-                continue
+        # The line kind is already known here, so the last member is only
+        # looked up for a confirmed stats line
+        elif kind == "raw_score":
+            if members:
+                members[-1].raw_score = int(m.group("raw_score"))
+        elif members:
+            members[-1].details = m.group("details").decode('utf-8')
 
     if current_group:
         groups.append(current_group)
         
     return groups
 
-def generate_html(groups, output_file):
-    """Generates a modern HTML infographic."""
-    
-    html_content = f"""<!DOCTYPE html>
+# Static part of the page (styles and header), emitted verbatim: a plain
+# string rather than an f-string, so the CSS braces need no escaping and
+# nothing is formatted per call. The group count follows it.
+_HTML_PREFIX_STATIC = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Group Attribution Results</title>
     <style>
-        :root {{
+        :root {
             --bg-color: #0f172a;
             --card-bg: #1e293b;
             --text-primary: #f8fafc;
             --text-secondary: #94a3b8;
             --accent-color: #38bdf8;
             --border-color: #334155;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Inter', system-ui, -apple-system, sans-serif;
             background-color: var(--bg-color);
             color: var(--text-primary);
             margin: 0;
             padding: 40px 20px;
             line-height: 1.5;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
-        }}
+        }
         
-        header {{
+        header {
             text-align: center;
             margin-bottom: 60px;
-        }}
+        }
         
-        h1 {{
+        h1 {
             font-size: 2.5rem;
             font-weight: 800;
             margin: 0;
             background: linear-gradient(to right, #38bdf8, #818cf8);
             -webkit-background-clip: text;
             -webkit-text-fill-color: transparent;
-        }}
+        }
         
-        .subtitle {{
+        .subtitle {
             color: var(--text-secondary);
             font-size: 1.1rem;
             margin-top: 10px;
-        }}
+        }
 
-        .grid {{
+        .grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
             gap: 24px;
-        }}
+        }
         
-        .card {{
+        .card {
             background: var(--card-bg);
             border: 1px solid var(--border-color);
             border-radius: 16px;
             overflow: hidden;
             transition: transform 0.2s, box-shadow 0.2s;
             position: relative;
-        }}
+        }
         
-        .card:hover {{
+        .card:hover {
             transform: translateY(-4px);
             box-shadow: 0 10px 30px -10px rgba(0,0,0,0.5);
             border-color: var(--accent-color);
-        }}
+        }
         
-        .card-header {{
+        .card-header {
             padding: 24px;
             border-bottom: 1px solid var(--border-color);
             background: linear-gradient(to bottom right, rgba(255,255,255,0.03), transparent);
             position: relative;
-        }}
+        }
         
-        .group-id {{
+        .group-id {
             text-transform: uppercase;
             font-size: 0.75rem;
             letter-spacing: 0.1em;
             color: var(--text-secondary);
             font-weight: 600;
             margin-bottom: 8px;
-        }}
+        }
         
-        .subject-title {{
+        .subject-title {
             font-size: 1.25rem;
             font-weight: 700;
             color: #fff;
             margin: 0;
             padding-right: 60px; /* Space for score */
-        }}
+        }
         
-        .total-score {{
+        .total-score {
             position: absolute;
             top: 24px;
             right: 24px;
@@ -181,27 +274,27 @@ def generate_html(groups, output_file):
             font-size: 0.875rem;
             font-weight: 600;
             border: 1px solid rgba(56, 189, 248, 0.2);
-        }}
+        }
         
-        .members-list {{
+        .members-list {
             padding: 24px;
-        }}
+        }
         
-        .member {{
+        .member {
             display: flex;
             align-items: flex-start;
             margin-bottom: 20px;
             padding-bottom: 20px;
             border-bottom: 1px solid rgba(255,255,255,0.05);
-        }}
+        }
         
-        .member:last-child {{
+        .member:last-child {
             border-bottom: none;
             margin-bottom: 0;
             padding-bottom: 0;
-        }}
+        }
         
-        .avatar {{
+        .avatar {
             width: 40px;
             height: 40px;
             border-radius: 50%;
@@ -214,26 +307,26 @@ def generate_html(groups, output_file):
             margin-right: 16px;
             flex-shrink: 0;
             font-size: 1rem;
-        }}
+        }
         
-        .member-info {{
+        .member-info {
             flex: 1;
-        }}
+        }
         
-        .member-name {{
+        .member-name {
             font-weight: 600;
             font-size: 1rem;
             color: #e2e8f0;
             margin-bottom: 2px;
-        }}
+        }
         
-        .member-email {{
+        .member-email {
             font-size: 0.8rem;
             color: var(--text-secondary);
             margin-bottom: 8px;
-        }}
+        }
 
-        .member-score {{
+        .member-score {
             font-size: 0.75rem;
             color: #fff;
             /* background set inline dynamically */
@@ -244,191 +337,258 @@ def generate_html(groups, output_file):
             display: inline-block;
             vertical-align: middle;
             box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-        }}
+        }
         
-        .badges {{
+        .badges {
             display: flex;
             flex-wrap: wrap;
             gap: 6px;
-        }}
+        }
         
-        .badge {{
+        .badge {
             font-size: 0.7rem;
             font-weight: 600;
             padding: 2px 8px;
             border-radius: 6px;
             display: inline-flex;
             align-items: center;
-        }}
+        }
         
         /* 1st Choice (+100) */
-        .badge-green {{
+        .badge-green {
             background: rgba(74, 222, 128, 0.15);
             color: #4ade80;
             border: 1px solid rgba(74, 222, 128, 0.2);
-        }}
+        }
         /* 2nd Choice (+80) */
-        .badge-lime {{
+        .badge-lime {
             background: rgba(163, 230, 53, 0.15);
             color: #a3e635;
             border: 1px solid rgba(163, 230, 53, 0.2);
-        }}
+        }
         /* 3rd Choice (+60) */
-        .badge-yellow {{
+        .badge-yellow {
             background: rgba(250, 204, 21, 0.15);
             color: #facc15;
             border: 1px solid rgba(250, 204, 21, 0.2);
-        }}
+        }
         /* 4th Choice (+40) */
-        .badge-orange {{
+        .badge-orange {
             background: rgba(251, 146, 60, 0.15);
             color: #fb923c;
             border: 1px solid rgba(251, 146, 60, 0.2);
-        }}
+        }
         /* 5th Choice (+20) */
-        .badge-red {{
+        .badge-red {
             background: rgba(248, 113, 113, 0.15);
             color: #f87171;
             border: 1px solid rgba(248, 113, 113, 0.2);
-        }}
+        }
         /* Unranked (0) */
-        .badge-gray {{
+        .badge-gray {
             background: rgba(148, 163, 184, 0.15);
             color: #94a3b8;
             border: 1px solid rgba(148, 163, 184, 0.2);
-        }}
+        }
         /* Partner Match (+25) */
-        .badge-blue {{
+        .badge-blue {
             background: rgba(56, 189, 248, 0.15);
             color: #38bdf8;
             border: 1px solid rgba(56, 189, 248, 0.2);
-        }}
+        }
     </style>
 </head>
 <body>
     <div class="container">
         <header>
             <h1>Attribution Results</h1>
-            <div class="subtitle">Generated from Solver Report • {len(groups)} Groups Formed</div>
-        </header>
-        
-        <div class="grid">
+            <div class="subtitle">Generated from Solver Report • """
+
+_HTML_SUFFIX = """
+        </div>
+    </div>
+</body>
+</html>
     """
-    
-    # Regex helper to parse details string
-    # "Subject Rank 1 (+100), Partner Match: jihad.ouard@imt-atlantique.net (Raw +25)"
-    subject_rank_re = re.compile(r"Subject Rank (\d+) \(\+(\d+)\)")
-    subject_unranked_re = re.compile(r"Subject Unranked")
-    partner_re = re.compile(r"Partner Match: ([^ ]+) \(Raw \+(\d+)\)")
-    
-    for g in groups:
-        html_content += f"""
+
+# Per-card markup, filled with the % operator: one C-level format call per
+# card or member instead of rebuilding a large f-string each time.
+_CARD_TMPL = """
             <div class="card">
                 <div class="card-header">
-                    <div class="group-id">Group {g['id']}</div>
-                    <h2 class="subject-title">{g['subject']}</h2>
-                    <div class="total-score">{g['score']} pts</div>
+                    <div class="group-id">Group %s</div>
+                    <h2 class="subject-title">%s</h2>
+                    <div class="total-score">%s pts</div>
                 </div>
                 <div class="members-list">
         """
-        
-        for m in g['members']:
-            initials = "".join([n[0] for n in m['name'].split()[:2]])
-            details = m['details']
-            
-            badges_html = ""
-            
-            # 1. Subject Badge
-            sub_m = subject_rank_re.search(details)
-            if sub_m:
-                rank = int(sub_m.group(1))
-                score = int(sub_m.group(2))
-                
-                badge_class = "badge-gray"
-                if score == 100: badge_class = "badge-green"
-                elif score == 80: badge_class = "badge-lime"
-                elif score == 60: badge_class = "badge-yellow"
-                elif score == 40: badge_class = "badge-orange"
-                elif score == 20: badge_class = "badge-red"
-                
-                badges_html += f'<span class="badge {badge_class}">Subject Rank {rank} (+{score})</span>'
-            elif subject_unranked_re.search(details):
-                badges_html += '<span class="badge badge-gray">Unranked (+0)</span>'
-                
-            # 2. Partner Badges
-            # Find all partner matches
-            for p_m in partner_re.finditer(details):
-                partner_email = p_m.group(1)
-                # Keep email short? nah, just show "Partner Match" or +25
-                # User asked for blue badge
-                badges_html += f'<span class="badge badge-blue">Partner Match (+25)</span>'
-            
-            # Self-choice warning?
-            if "Ignored self-choice" in details:
-                 badges_html += f'<span class="badge badge-gray">Self-choice Ignored</span>'
-
-            # Determine score color
-            try:
-                raw_score_val = int(m['raw_score'])
-            except:
-                raw_score_val = 0
-                
-            if raw_score_val >= 120:
-                score_bg = "linear-gradient(135deg, #10b981, #059669)" # Green
-            elif raw_score_val >= 100:
-                score_bg = "linear-gradient(135deg, #0ea5e9, #0284c7)" # Blue
-            elif raw_score_val >= 80:
-                score_bg = "linear-gradient(135deg, #84cc16, #65a30d)" # Lime
-            elif raw_score_val >= 60:
-                score_bg = "linear-gradient(135deg, #f59e0b, #d97706)" # Amber
-            else:
-                score_bg = "linear-gradient(135deg, #ef4444, #b91c1c)" # Red
 
-            html_content += f"""
+_MEMBER_TMPL = """
                     <div class="member">
-                        <div class="avatar">{initials}</div>
+                        <div class="avatar">%s</div>
                         <div class="member-info">
                             <div class="member-name">
-                                {m['name']}
-                                <span class="member-score" style="background: {score_bg}">+{m['raw_score']}</span>
+                                %s
+                                <span class="member-score" style="background: %s">+%s</span>
                             </div>
-                            <div class="member-email">{m['email']}</div>
+                            <div class="member-email">%s</div>
                             <div class="badges">
-                                {badges_html}
+                                %s
                             </div>
                         </div>
                     </div>
             """
-            
-        html_content += """
+
+# Rendered pages, keyed by a hash of the input report and this script's size and mtime
+_CACHE_DIR = os.path.expanduser("~/.cache/pml_attribution")
+
+# Process-pool rendering. A card takes ~5 us to render, while the parent alone
+# spends ~2.2 us per group pickling groups and unpickling cards (measured with
+# 20k groups), plus ~1.2 ms start-up per worker. So the pool can only win on
+# several cores and for very large reports: break-even is estimated at ~3-5k
+# groups on 4-8 cores, and it never wins on 1-2 cores.
+_PARALLEL_MIN_GROUPS = 5000
+_PARALLEL_MIN_CPUS = 4
+_PARALLEL_CHUNKSIZE = 512 # large chunks keep the per-task IPC overhead down
+
+_CARD_CLOSE = """
                 </div>
             </div>
         """
+
+def _render_group(g):
+    """Renders one group card as a single string."""
+    parts = [_CARD_TMPL % (g.id, g.subject, g.score)]
+    
+    for m in g.members:
+        details = m.details
         
-    html_content += """
-        </div>
-    </div>
-</body>
-</html>
-    """
+        # One sweep over the details string collects every badge
+        subject_badge = ""
+        partner_badges = []
+        self_choice_badge = ""
+        for tok in _DETAIL_TOKEN_RE.finditer(details):
+            kind = tok.lastgroup
+            
+            # 1. Subject Badge (first subject note only)
+            if kind == "score":
+                if subject_badge: continue
+                rank = int(tok.group("rank"))
+                score = int(tok.group("score"))
+                
+                badge_class = _SCORE_BADGE.get(score, "badge-gray")
+                subject_badge = _BADGE_RANK_TMPL % (badge_class, rank, score)
+            elif kind == "unranked":
+                if not subject_badge:
+                    subject_badge = _BADGE_UNRANKED
+                
+            # 2. Partner Badges
+            # Keep email short? nah, just show "Partner Match" or +25
+            # User asked for blue badge
+            elif kind == "partner":
+                partner_badges.append(_BADGE_PARTNER)
+            
+            # Self-choice warning?
+            else:
+                self_choice_badge = _BADGE_SELF
+
+        badges_html = subject_badge + "".join(partner_badges) + self_choice_badge
+
+        # Determine score color
+        raw_score_val = m.raw_score
+            
+        if raw_score_val >= 120:
+            score_bg = "linear-gradient(135deg, #10b981, #059669)" # Green
+        elif raw_score_val >= 100:
+            score_bg = "linear-gradient(135deg, #0ea5e9, #0284c7)" # Blue
+        elif raw_score_val >= 80:
+            score_bg = "linear-gradient(135deg, #84cc16, #65a30d)" # Lime
+        elif raw_score_val >= 60:
+            score_bg = "linear-gradient(135deg, #f59e0b, #d97706)" # Amber
+        else:
+            score_bg = "linear-gradient(135deg, #ef4444, #b91c1c)" # Red
+
+        parts.append(_MEMBER_TMPL % (m.initials, m.name, score_bg, m.raw_score,
+                                     m.email, badges_html))
+        
+    parts.append(_CARD_CLOSE)
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    return "".join(parts)
+
+def generate_html(groups, output_file):
+    """Generates a modern HTML infographic."""
+    
+    # Stream the page out one card at a time instead of holding it all in memory
+    with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as out:
+        out.write(_HTML_PREFIX_STATIC)
+        out.write(f"{len(groups)} Groups Formed</div>\n        </header>\n        \n        <div class=\"grid\">\n    ")
+        # Cards are independent, but serialising them costs almost as much
+        # as rendering them: only use a pool where that can pay off
+        if (len(groups) > _PARALLEL_MIN_GROUPS
+                and (os.cpu_count() or 1) >= _PARALLEL_MIN_CPUS):
+            with ProcessPoolExecutor() as ex:
+                for card in ex.map(_render_group, groups, chunksize=_PARALLEL_CHUNKSIZE):
+                    out.write(card)
+        else:
+            for g in groups:
+                out.write(_render_group(g))
+        out.write(_HTML_SUFFIX)
         
     print(f"Successfully generated {output_file}")
 
+
+def _cache_path(data):
+    """Cache file for report bytes: same report and same script give the same page."""
+    h = hashlib.blake2b(data, digest_size=16)
+    # The script's size and mtime stand in for its source: editing the
+    # templates invalidates the cache without re-reading the file each run
+    st = os.stat(__file__)
+    h.update(b"%d:%d" % (st.st_size, st.st_mtime_ns))
+    return os.path.join(_CACHE_DIR, h.hexdigest() + ".html")
+
+def _store_in_cache(output_html, cache_path):
+    """Copies the page into the cache through a temp file, so a cache entry is
+    either complete or absent."""
+    tmp = None
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as dst, open(output_html, 'rb') as src:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp, cache_path)
+    except OSError:
+        # The cache is best effort
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+
 def main():
     parser = argparse.ArgumentParser(description="Visualize Attribution Report")
     parser.add_argument("input_report", help="Path to the .txt report file")
     parser.add_argument("output_html", help="Path to the output .html file")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-render instead of reusing a cached page")
     args = parser.parse_args()
     
     if not os.path.exists(args.input_report):
         print(f"Error: File {args.input_report} not found.")
         sys.exit(1)
-        
-    groups = parse_report(args.input_report)
+
+    if args.no_cache:
+        generate_html(parse_report(args.input_report), args.output_html)
+        return
+
+    # Open the report once: the same bytes are hashed and parsed, so a pipe
+    # is not drained by the hash before the parser gets to it
+    with _open_report(args.input_report) as (data, lines):
+        cache_path = _cache_path(data)
+        if os.path.exists(cache_path):
+            shutil.copyfile(cache_path, args.output_html)
+            print(f"Successfully generated {args.output_html} (cached)")
+            return
+        groups = _parse_any(lines)
+
     generate_html(groups, args.output_html)
+    _store_in_cache(args.output_html, cache_path)
 
 if __name__ == "__main__":
     main()